@@ -3,7 +3,7 @@ import socket
 import threading
 import time
 from game import PLAYER_COLORS
-from network import send_data, recv_data
+from network import send_data, recv_data, send_frame, encode_move
 from helper import args
 
 '''
@@ -80,8 +80,9 @@ class Client:
 
     def network_listener(self):
         """Background thread to receive messages from the server and update local state."""
+        recv_buf = bytearray(4096)  # reused across messages to avoid per-frame allocation
         while True:
-            data = recv_data(self.sock)
+            data = recv_data(self.sock, recv_buf)
             if not data:
                 # Connection closed or error
                 print("Disconnected from server.")
@@ -100,6 +101,15 @@ class Client:
                 with self.lock:
                     self.in_lobby = False
 
+            elif msg_type == "pmove":
+                # Delta update: a single player moved, leave the rest of the
+                # state untouched
+                with self.lock:
+                    info = self.players.get(data["pid"])
+                    if info:
+                        info["x"] = data["x"]
+                        info["y"] = data["y"]
+
             elif msg_type == "state":
                 # Update game state (positions, scores, microphones, time)
                 with self.lock:
@@ -128,7 +138,16 @@ class Client:
             elif msg_type == "answer_result":
                 # Feedback on an answer submitted by this player
                 correct = data.get("correct", False)
+                state = data.get("state")
                 with self.lock:
+                    if state:
+                        # Server piggybacks the post-answer state here instead
+                        # of sending this client a separate state message
+                        self.players = state["players"]
+                        self.microphones = state["microphones"]
+                        self.time_left = state["time_left"]
+                        if state.get("game_over"):
+                            self.game_over = True
                     if correct:
                         # Correct answer; exit quiz mode
                         self.in_question = False
@@ -197,7 +216,7 @@ class Client:
 
     def send_move(self, direction):
         """Send a movement command (direction: 'up','down','left','right') to the server."""
-        send_data(self.sock, {"type": "move", "direction": direction})
+        send_frame(self.sock, encode_move(direction))
 
     def send_interact(self):
         """Send an interaction command to the server (attempt to use a microphone)."""
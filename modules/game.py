@@ -13,23 +13,62 @@ PLAYER_COLORS = {
 }
 
 class Player:
+    __slots__ = ("id", "state_view", "ready", "lock")
+
     def __init__(self, pid, x, y):
         self.id = pid
-        self.x = x
-        self.y = y
-        self.score = 0
+        # Reusable view dict shared with the server's state broadcasts, so no
+        # per-tick dicts have to be rebuilt; x/y/score proxy into it.
+        self.state_view = {"x": x, "y": y, "score": 0}
         self.ready = False  # For lobby readiness
-    
-    
+        self.lock = threading.Lock()  # Guards x/y/score mutations for this player only
+
+    @property
+    def x(self):
+        return self.state_view["x"]
+
+    @x.setter
+    def x(self, value):
+        self.state_view["x"] = value
+
+    @property
+    def y(self):
+        return self.state_view["y"]
+
+    @y.setter
+    def y(self, value):
+        self.state_view["y"] = value
+
+    @property
+    def score(self):
+        return self.state_view["score"]
+
+    @score.setter
+    def score(self, value):
+        self.state_view["score"] = value
+
+
 class Microphone:
+    __slots__ = ("id", "x", "y", "state_view", "question", "options",
+                 "correct_index", "active_by", "cooldowns")
+
     def __init__(self, mid, x, y, question, options, correct_index):
         self.id = mid
         self.x = x
         self.y = y
+        # Reusable view dict shared with the server's state broadcasts;
+        # only "answered" ever changes after construction.
+        self.state_view = {"id": mid, "x": x, "y": y, "answered": False}
         self.question = question
         self.options = options
         self.correct_index = correct_index
-        self.answered = False
-        self.active_by = None  # player id currently interacting (if any)
-        self.lock = threading.RLock()  # Dedicated lock for concurrency control
-        self.cooldowns = {}  # Dict: {player_id: timestamp_until_accessible}
\ No newline at end of file
+        self.active_by = None  # player id currently interacting (if any); claimed/released under the server lock
+        self.cooldowns = {}  # Dict: {player_id: timestamp_until_accessible}
+
+    @property
+    def answered(self):
+        return self.state_view["answered"]
+
+    @answered.setter
+    def answered(self, value):
+        self.state_view["answered"] = value
\ No newline at end of file
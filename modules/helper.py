@@ -25,4 +25,10 @@ parser.add_argument(
     help="Server's Port Number."
 )
 
+parser.add_argument(
+    "--headless",
+    action="store_true",
+    help="Run the server without a pygame window (dedicated server)."
+)
+
 args = parser.parse_args()
\ No newline at end of file
@@ -1,39 +1,153 @@
 import pickle
+import select
+import struct
+
+try:
+    import msgpack  # C-backed serializer, much faster than pickle for these small dicts
+except ImportError:
+    msgpack = None
 
 '''
     Network utilities for send and receive data using Python TCP Socket object
 '''
 
+# Precompiled 4-byte big-endian length prefix for message framing
+_LEN = struct.Struct(">I")
+
+# First payload byte tags the codec so peers with and without msgpack
+# installed can still talk to each other
+_FMT_PICKLE = 0x50   # 'P'
+_FMT_MSGPACK = 0x4D  # 'M'
+
+# Specialized fixed-layout encodings for the two highest-frequency
+# messages; the tag byte doubles as the message type
+_FMT_MOVE = 0x01     # client -> server move request: 1-byte direction code
+_FMT_PMOVE = 0x02    # server -> clients position delta: pid, x, y
+
+_PMOVE = struct.Struct(">Bhh")
+_DIR_CODES = {"up": 0, "down": 1, "left": 2, "right": 3}
+_DIR_NAMES = ("up", "down", "left", "right")
+
+def encode_move(direction):
+    """Encode a move request as a 2-byte binary payload."""
+    payload = bytes((_FMT_MOVE, _DIR_CODES[direction]))
+    return _LEN.pack(len(payload)) + payload
+
+def encode_pmove(pid, x, y):
+    """Encode a player-position delta as a 6-byte binary payload."""
+    payload = bytes((_FMT_PMOVE,)) + _PMOVE.pack(pid, x, y)
+    return _LEN.pack(len(payload)) + payload
+
+def _decode_payload(payload):
+    """Deserialize a tagged message payload.
+
+    The binary move/pmove layouts decode into the same dict shapes the
+    generic codecs produce, so message handlers never see the difference.
+    """
+    if payload[0] == _FMT_MOVE:
+        return {"type": "move", "direction": _DIR_NAMES[payload[1]]}
+    if payload[0] == _FMT_PMOVE:
+        pid, x, y = _PMOVE.unpack_from(payload, 1)
+        return {"type": "pmove", "pid": pid, "x": x, "y": y}
+    if payload[0] == _FMT_MSGPACK:
+        if msgpack is None:
+            raise ValueError("peer sent a msgpack frame but msgpack is not installed")
+        return msgpack.unpackb(payload[1:], raw=False, strict_map_key=False)
+    return pickle.loads(payload[1:])
+
+def encode_message(data):
+    """Serialize a Python object into a complete length-prefixed frame.
+
+    Header, codec tag and body are assembled into a single buffer with
+    pack_into, so no intermediate header+payload concatenation happens.
+    Callers treat the returned frame as immutable.
+    """
+    if msgpack is not None:
+        tag, body = _FMT_MSGPACK, msgpack.packb(data, use_bin_type=True)
+    else:
+        tag, body = _FMT_PICKLE, pickle.dumps(data)
+    frame = bytearray(5 + len(body))
+    _LEN.pack_into(frame, 0, len(body) + 1)
+    frame[4] = tag
+    frame[5:] = body
+    return frame
+
+def send_frame(sock, frame):
+    """Send an already-encoded frame over a TCP socket.
+
+    Works on both blocking and non-blocking sockets: if the kernel buffer
+    is momentarily full, wait for writability and resume from where the
+    partial send stopped.
+    """
+    view = memoryview(frame)
+    try:
+        while view:
+            try:
+                sent = sock.send(view)
+                view = view[sent:]
+            except BlockingIOError:
+                select.select([], [sock], [], 0.05)
+    except Exception as e:
+        # Handle send exceptions (e.g., broken connection)
+        print(f"send_frame error: {e}")
+
+def extract_frames(buf):
+    """Deserialize every complete length-prefixed frame in buf, consuming them.
+
+    buf is a bytearray accumulating raw socket reads; any trailing partial
+    frame is left in place for the next read to complete.
+    """
+    messages = []
+    while len(buf) >= 4:
+        length = _LEN.unpack_from(buf, 0)[0]
+        if len(buf) < 4 + length:
+            break
+        try:
+            messages.append(_decode_payload(bytes(buf[4:4 + length])))
+        except Exception as e:
+            print(f"extract_frames error: {e}")
+        del buf[:4 + length]
+    return messages
+
 def send_data(sock, data):
     """Serialize and send a Python object over a TCP socket."""
     try:
-        # Serialize the data (use pickle for simplicity)
-        payload = pickle.dumps(data)
-        # Send the length of the payload first (fixed 4-byte header)
-        length = len(payload)
-        sock.sendall(length.to_bytes(4, 'big') + payload)
+        sock.sendall(encode_message(data))
     except Exception as e:
         # Handle send exceptions (e.g., broken connection)
         print(f"send_data error: {e}")
 
-def recv_data(sock):
-    """Receive a serialized Python object from a TCP socket."""
+def recv_data(sock, buf=None):
+    """Receive a serialized Python object from a TCP socket.
+
+    Pass a reusable bytearray as buf to avoid allocating a fresh receive
+    buffer per message; it is grown once to fit the largest frame seen.
+    """
     try:
         # Read the 4-byte length header (type)
         raw_length = sock.recv(4)
         if not raw_length:
             return None  # connection closed
-        length = int.from_bytes(raw_length, 'big')
-        # Receive the data based on length
-        data_bytes = b''
-        while len(data_bytes) < length:
-            packet = sock.recv(length - len(data_bytes))
-            if not packet:
+        while len(raw_length) < 4:
+            more = sock.recv(4 - len(raw_length))
+            if not more:
+                return None
+            raw_length += more
+        length = _LEN.unpack(raw_length)[0]
+        # Receive the data based on length, directly into the buffer
+        if buf is None:
+            buf = bytearray(length)
+        elif len(buf) < length:
+            buf.extend(bytes(length - len(buf)))
+        view = memoryview(buf)
+        received = 0
+        while received < length:
+            n = sock.recv_into(view[received:length])
+            if not n:
                 return None
-            data_bytes += packet
+            received += n
         # Deserialize the object
-        data = pickle.loads(data_bytes)
-        return data
+        return _decode_payload(view[:length])
     except Exception as e:
         print(f"recv_data error: {e}")
         return None
@@ -1,10 +1,18 @@
+import os
 import socket
+import selectors
 import threading
 import time
 import random
+import itertools
 import json
-import pygame
-from network import send_data, recv_data
+import pickle
+from collections import deque
+try:
+    import pygame
+except ImportError:
+    pygame = None  # a dedicated (--headless) server runs without pygame installed
+from network import send_data, encode_message, encode_pmove, extract_frames
 from game import Microphone, Player, PLAYER_COLORS
 from helper import args
 
@@ -18,84 +26,153 @@ from helper import args
         - handling cocurrency between 'microphone' objects
 '''
 
+# Direction name -> (dx, dy) grid offset for movement handling
+DIRS = {"up": (0, -1), "down": (0, 1), "left": (-1, 0), "right": (1, 0)}
+
+
+def wrap_text(text, font, max_width):
+    """Split text into multiple lines that fit within max_width."""
+    words = text.split(' ')
+    lines = []
+    current_line = ""
+    for word in words:
+        test_line = current_line + word + " "
+        if font.size(test_line)[0] <= max_width:
+            current_line = test_line
+        else:
+            lines.append(current_line.strip())
+            current_line = word + " "
+    if current_line:
+        lines.append(current_line.strip())
+    return lines
+
+
+# Fixed replies on the contention paths, encoded once at import so a
+# rejected interact or wrong answer costs no dict or serializer work
+_COOLDOWN_FRAME = encode_message({"type": "info", "message": "Please wait 3 seconds before trying again."})
+_MIC_BUSY_FRAME = encode_message({"type": "info", "message": "Microphone is currently in use by another player."})
+_QUIZ_CANCELLED_FRAME = encode_message({"type": "info", "message": "Quiz cancelled. You may try again."})
+_ANSWER_WRONG_FRAME = encode_message({"type": "answer_result", "correct": False})
+
 
 class Server:
-    def __init__(self, host, port, time_limit, max_players=4):
+    def __init__(self, host, port, time_limit, max_players=4, headless=False):
         self.host = host
         self.port = port
         self.max_players = max_players
+        self.headless = headless
         self.time_limit = time_limit
-        self.start_time = None
+        self._time_left = time_limit  # int seconds, refreshed once per tick
+        self._tick_event = threading.Event()  # set by stop() to cut tick waits short
+        self.start_time = None  # monotonic timestamp once the game starts
         self.game_started = False
         self.game_over = False
         self.lobby_active = True
         self.countdown = None  # For lobby countdown display
+        self._countdown_value = 0     # steps left in a scheduled countdown
+        self._countdown_deadline = None  # monotonic time of the next countdown tick
+        self._ready_count = 0  # players currently ready, kept in step with toggles
+        self._ui_dirty = True        # something changed since the last redraw
+        self._last_drawn_second = -1 # timer value at the last redraw
+        self._lobby_dirty = True     # lobby roster changed since the last redraw
 
         # Game state data structures
         self.players = {}      # {player_id: Player}
+        self._players_view = {} # {player_id: player.state_view}, reused every broadcast
         self.clients = {}      # {player_id: socket}
+        self._client_ids = ()  # tuple snapshot of client pids, rebuilt on accept/disconnect
+        self._client_ctx = {}  # {player_id: per-connection context (recv/out buffers)}
         self.microphones = []  # List of Microphone objects
+        self._mics_view = []   # [mic.state_view, ...], reused every broadcast
+        self._mics_by_pos = {} # {(x, y): Microphone} for O(1) interact lookup
+        self._mics_by_id = {}  # {mic_id: Microphone} for O(1) answer/cancel lookup
+        self._next_mic_id = 1  # next id to assign, maintained by _register_mic
+        self._question_frames = {}  # {mic_id: encoded question frame}, built on registration
+        self._unanswered_count = 0  # live count of unanswered mics, maintained alongside answered flips
 
         # Define the game world (grid size and obstacles)
         self.GRID_SIZE = 20
         self.map_width = 50
         self.map_height = 40
-        self.obstacles = set()
+        # Obstacles as a flat row-major occupancy bitmap: collision tests are
+        # a single byte read, no (x, y) tuple to build and hash per move.
+        # Immutable after construction, so readers never need a lock.
+        self.obstacle_grid = bytearray(self.map_width * self.map_height)
         for y in range(5, 10):
-            self.obstacles.add((15, y))
+            self.obstacle_grid[y * self.map_width + 15] = 1
+        # Every walkable cell, for sampling mic spawn positions without
+        # rejection loops over obstacle cells
+        self._free_cells = [(x, y)
+                            for y in range(self.map_height)
+                            for x in range(self.map_width)
+                            if not self.obstacle_grid[y * self.map_width + x]]
+
+        # Corner spawn points, indexed by player_id - 1 (see find_spawn_position)
+        self._spawns = (
+            (0, 2),                                    # Player 1: top-left
+            (self.map_width - 1, 2),                   # Player 2: top-right
+            (0, self.map_height - 1),                  # Player 3: bottom-left
+            (self.map_width - 1, self.map_height - 1)  # Player 4: bottom-right
+        )
 
         # Read quiz bank from file and randomly generate 10 quiz objects
         try:
-            with open("./quizQuestions.json", "r") as f:
-                quiz_data = json.load(f)
-            all_questions = quiz_data.get("Questions", [])
-            # Convert the correct_index from string to int for each question.
-            for q in all_questions:
-                q["correct_index"] = int(q["correct_index"])
+            all_questions = self._load_quiz_bank()
             num_quiz = min(10, len(all_questions))
             random.shuffle(all_questions)
             selected_questions = all_questions[:num_quiz]
-            self.unused_questions = all_questions[num_quiz:]  # remaining unique questions
+            # deque: the spawn path pops from the front on every correct answer
+            self.unused_questions = deque(all_questions[num_quiz:])
 
-            self.microphones = []
-            mic_id = 1
-            for question in selected_questions:
-                # Generate a random valid position
-                while True:
-                    x = random.randint(0, self.map_width - 1)
-                    y = random.randint(0, self.map_height - 1)
-                    if (x, y) not in self.obstacles:
-                        break
-                self.microphones.append(Microphone(mic_id, x, y, question["question"], question["options"], question["correct_index"]))
-                mic_id += 1
+            # One sample gives every mic a distinct walkable cell (the old
+            # retry loop could stack two mics on the same tile)
+            positions = random.sample(self._free_cells, num_quiz)
+            for mic_id, (question, (x, y)) in enumerate(zip(selected_questions, positions), start=1):
+                self._register_mic(Microphone(mic_id, x, y, question["question"], question["options"], question["correct_index"]))
         except Exception as e:
             print(f"Error loading quiz bank: {e}")
             # set empty questions and objects when error
             self.microphones = []
-            self.unused_questions = []
+            self._mics_view = []
+            self._mics_by_pos = {}
+            self._mics_by_id = {}
+            self._question_frames = {}
+            self.unused_questions = deque()
 
         # Synchronization lock for thread-safe state updates
         self.lock = threading.Lock()
 
+        # Encoded-state cache: bump _state_version on any mutation that is
+        # visible in the state message so unchanged ticks reuse the same frame.
+        # Bumps go through an itertools counter so handlers that only hold a
+        # per-resource lock can still publish a new version safely.
+        self._version_counter = itertools.count(1)
+        self._state_version = 0
+        self._state_key = None
+        self._state_frame = None
+        self._sent_state_key = None  # last state key the tick loop broadcast
+
         # Set up the server socket
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Allow additional accept sockets on the same port (kernel load-balances
+        # incoming connections) should the player cap ever grow beyond one
+        # accept loop. Not available on every platform, hence the guard.
+        if hasattr(socket, "SO_REUSEPORT"):
+            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         self.server_socket.bind((self.host, self.port))
         self.server_socket.listen()
         print(f"Server listening on {self.host}:{self.port}")
 
-        # Pygame initialization for lobby and game display
-        pygame.init()
-        # Match client window size: 1000 x 800 (50*20 x 40*20)
-        self.lobby_screen = pygame.display.set_mode((1000, 800))
-        pygame.display.set_caption("Server Lobby")
-        self.font = pygame.font.SysFont(None, 24)
+        # Single-threaded event loop (epoll on Linux) replaces one blocking
+        # thread per client; key.data is None for the listen socket and a
+        # per-connection context dict for client sockets
+        self.selector = selectors.DefaultSelector()
+        self.server_socket.setblocking(False)
+        self.selector.register(self.server_socket, selectors.EVENT_READ, data=None)
 
-        # Colors for quiz overlay
-        self.color_overlay_bg = (255, 255, 255)
-        self.color_overlay_text = (0, 0, 0)
-
-        # Define some colors for drawing
+        # Define some colors for drawing (before the pygame block below, which
+        # bakes them into init-time surfaces)
         self.color_bg = (200, 200, 200)         # background color
         self.color_player = (0, 0, 255)         # local player color
         self.color_other_player = (0, 255, 0)   # other players color
@@ -104,39 +181,115 @@ class Server:
         self.color_overlay_bg = (255, 255, 255) # overlay background (white)
         self.color_overlay_text = (0, 0, 0)    # overlay text color (black)
 
+        # Pygame initialization for lobby and game display.  Skipped entirely
+        # in headless mode so rendering never contends the GIL with the
+        # network threads on a dedicated server.
+        if not self.headless:
+            if pygame is None:
+                raise RuntimeError("pygame is required unless the server runs with --headless")
+            pygame.init()
+            # The loops below only read QUIT and KEYDOWN; block every other
+            # type so unconsumed events can never fill the queue (blocked
+            # first — set_allowed(None) would have allowed everything)
+            pygame.event.set_blocked(None)
+            pygame.event.set_allowed((pygame.QUIT, pygame.KEYDOWN))
+            # Match client window size: 1000 x 800 (50*20 x 40*20)
+            self.lobby_screen = pygame.display.set_mode((1000, 800))
+            pygame.display.set_caption("Server Lobby")
+            # Static background, built once and blitted per frame; convert()
+            # matches the display pixel format for the fast blit path
+            self._static_bg = pygame.Surface(self.lobby_screen.get_size()).convert()
+            self._static_bg.fill(self.color_bg)
+            self.font = pygame.font.SysFont(None, 24)
+            # Build every font once; Font() re-parses the font file, which is
+            # far too slow to sit inside the 60 Hz draw path.
+            self.font_question = pygame.font.Font(None, 36)
+            self.font_option = pygame.font.Font(None, 36)
+            self.font_feedback = pygame.font.Font(None, 32)
+            self.font_title = pygame.font.Font(None, 80)
+            self.font_score = pygame.font.Font(None, 50)
+            self.font_exit = pygame.font.Font(None, 40)
+            self._text_cache = {}  # (font, text, color) -> rendered Surface
+            self._tile_surfs = {}    # color -> 20x20 Surface for mic/player tiles
+            self._wrapped_question_for = None    # question text the wrap below matches
+            self._wrapped_question_lines = None  # cached wrap_text result
+            # Static overlay surfaces, built once instead of per frame
+            self._quiz_overlay = pygame.Surface((800, 500), pygame.SRCALPHA)
+            self._quiz_overlay.fill((255, 255, 255, 230))  # White with slight transparency
+            pygame.draw.rect(self._quiz_overlay, self.color_text, self._quiz_overlay.get_rect(), 2)
+            self._gameover_overlay = pygame.Surface(self.lobby_screen.get_size())
+            self._gameover_overlay.fill(self.color_bg)
+            # Key tables: one dict lookup per keypress instead of walking
+            # an if/elif ladder in the event loop
+            self._move_keys = {
+                pygame.K_w: "up", pygame.K_UP: "up",
+                pygame.K_s: "down", pygame.K_DOWN: "down",
+                pygame.K_a: "left", pygame.K_LEFT: "left",
+                pygame.K_d: "right", pygame.K_RIGHT: "right",
+            }
+            self._quiz_keys = {pygame.K_1: 0, pygame.K_2: 1, pygame.K_3: 2, pygame.K_4: 3}
+
         # Additional attributes for quiz state (for server player)
         self.in_question = False
         self.current_question = None   # Format: {"id": mic_id, "text": question, "options": [...]}
         self.last_answer_correct = None  # None, True, or False
 
-        # Define the server-controlled player (use player_id 1)
+        # Define the server-controlled player (use player_id 1).  A headless
+        # server is a dedicated host that does not play, so no player is
+        # created for it and the first client takes player_id 1 instead.
         self.server_player_id = 1
-        spawn_x, spawn_y = self.find_spawn_position(self.server_player_id)
-        self.players[self.server_player_id] = Player(self.server_player_id, spawn_x, spawn_y)
-        self.players[self.server_player_id].ready = True  # Server is auto-ready
+        if not self.headless:
+            spawn_x, spawn_y = self.find_spawn_position(self.server_player_id)
+            host = Player(self.server_player_id, spawn_x, spawn_y)
+            host.ready = True  # Server is auto-ready
+            self._add_player(host)
+
+        # Specialize the state-message builder now that the state containers exist
+        self.build_state_message = self._make_state_builder()
+
+    def _render(self, font, text, color):
+        """Render text via a memo cache: labels like scores and the timer
+        change at most once a second, not 60 times."""
+        key = (id(font), text, color)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            if len(self._text_cache) > 256:
+                self._text_cache.clear()
+            surface = font.render(text, True, color)
+            self._text_cache[key] = surface
+        return surface
+
+    def _tile_surf(self, color):
+        """Return the shared 20x20 grid-tile surface for color, building it
+        on first use in the display pixel format."""
+        surf = self._tile_surfs.get(color)
+        if surf is None:
+            surf = pygame.Surface((self.GRID_SIZE, self.GRID_SIZE)).convert()
+            surf.fill(color)
+            self._tile_surfs[color] = surf
+        return surf
 
     def draw_game(self):
-        self.lobby_screen.fill((200, 200, 200))  # Light gray background
+        self.lobby_screen.blit(self._static_bg, (0, 0))  # Light gray background
 
         if not self.game_over:
-            # Draw microphones
-            for mic in self.microphones:
-                if not mic.answered:
-                    rect = pygame.Rect(mic.x * 20, mic.y * 20, 20, 20)
-                    pygame.draw.rect(self.lobby_screen, self.color_microphone, rect)
-            
-            # Draw players
+            # Draw microphones and players with one blits() call: the tile
+            # surfaces are prebuilt per color and the actual blitting runs in
+            # a single C loop instead of one draw.rect call per entity
+            mic_surf = self._tile_surf(self.color_microphone)
+            blit_seq = [(mic_surf, (mic.x * 20, mic.y * 20))
+                        for mic in self.microphones if not mic.answered]
             for pid, info in self.players.items():
-                rect = pygame.Rect(info.x * 20, info.y * 20, 20, 20)
-                color = self.get_player_color(pid)
-                pygame.draw.rect(self.lobby_screen, color, rect)
-            
+                blit_seq.append((self._tile_surf(self.get_player_color(pid)),
+                                 (info.x * 20, info.y * 20)))
+            self.lobby_screen.blits(blit_seq, doreturn=False)
+
             # Draw timer
             if self.start_time:
-                elapsed = int(time.time() - self.start_time)
+                elapsed = int(time.monotonic() - self.start_time)
                 time_left = max(0, self.time_limit - elapsed)
                 timer_text = f"Time: {time_left // 60:02d}:{time_left % 60:02d}"
-                txt_surface = self.font.render(timer_text, True, self.color_text)
+                txt_surface = self._render(self.font, timer_text, self.color_text)
                 self.lobby_screen.blit(txt_surface, (20, 20))
             
             # Draw scores
@@ -144,26 +297,9 @@ class Server:
             score_x = self.map_width * self.GRID_SIZE - 150
             for pid, info in self.players.items():
                 score_text = f"Player {pid}: {info.score}"
-                txt_surface = self.font.render(score_text, True, self.color_text)
+                txt_surface = self._render(self.font, score_text, self.color_text)
                 self.lobby_screen.blit(txt_surface, (score_x, y_offset))
                 y_offset += 20
-            
-            def wrap_text(text, font, max_width):
-                """Split text into multiple lines that fit within max_width."""
-                words = text.split(' ')
-                lines = []
-                current_line = ""
-                for word in words:
-                    test_line = current_line + word + " "
-                    if font.size(test_line)[0] <= max_width:
-                        current_line = test_line
-                    else:
-                        lines.append(current_line.strip())
-                        current_line = word + " "
-                if current_line:
-                    lines.append(current_line.strip())
-                return lines
-            
             # Draw question if active
             if self.in_question and self.current_question:
                 # Define quiz box dimensions and position (you can adjust these as needed)
@@ -172,24 +308,26 @@ class Server:
                 quiz_box_width = 800
                 quiz_box_height = 500
 
-                # Create an overlay surface with transparency and a border for UI enhancement
-                overlay = pygame.Surface((quiz_box_width, quiz_box_height), pygame.SRCALPHA)
-                overlay.fill((255, 255, 255, 230))  # White with slight transparency
-                pygame.draw.rect(overlay, self.color_text, overlay.get_rect(), 2)  # Black border
-                self.lobby_screen.blit(overlay, (quiz_box_x, quiz_box_y))
+                # Blit the prebuilt translucent, bordered overlay surface
+                self.lobby_screen.blit(self._quiz_overlay, (quiz_box_x, quiz_box_y))
 
-                # Set fonts for the question and options
-                font_question = pygame.font.Font(None, 36)
-                font_option = pygame.font.Font(None, 36)
+                # Fonts for the question and options (built once in __init__)
+                font_question = self.font_question
+                font_option = self.font_option
 
-                # Wrap the question text
-                max_text_width = quiz_box_width - 40  # leave some horizontal padding
-                wrapped_lines = wrap_text(self.current_question["text"], font_question, max_text_width)
+                # Wrap the question text, reusing the cached wrap until the
+                # question changes (font.size is a metrics call per word)
+                question_text = self.current_question["text"]
+                if question_text != self._wrapped_question_for:
+                    max_text_width = quiz_box_width - 40  # leave some horizontal padding
+                    self._wrapped_question_for = question_text
+                    self._wrapped_question_lines = wrap_text(question_text, font_question, max_text_width)
+                wrapped_lines = self._wrapped_question_lines
                 line_y = quiz_box_y + 20  # top padding inside the quiz box
 
                 # Render each wrapped line of the question
                 for line in wrapped_lines:
-                    line_surface = font_question.render(line, True, self.color_overlay_text)
+                    line_surface = self._render(font_question, line, self.color_overlay_text)
                     self.lobby_screen.blit(line_surface, (quiz_box_x + 20, line_y))
                     line_y += font_question.get_linesize() + 5  # add small spacing between lines
 
@@ -197,25 +335,22 @@ class Server:
                 option_y = line_y + 20
                 for idx, option in enumerate(self.current_question["options"], start=1):
                     option_text = f"{idx}. {option}"
-                    option_surface = font_option.render(option_text, True, self.color_overlay_text)
+                    option_surface = self._render(font_option, option_text, self.color_overlay_text)
                     self.lobby_screen.blit(option_surface, (quiz_box_x + 40, option_y))
                     option_y += font_option.get_linesize() + 15  # spacing between options
 
                 # Render feedback message if the last answer was incorrect
                 if self.last_answer_correct is False:
-                    feedback_surface = pygame.font.Font(None, 32).render("Incorrect! Please press 'ECS' to exit and trg again!", True, (255, 0, 0))
+                    feedback_surface = self._render(self.font_feedback, "Incorrect! Please press 'ECS' to exit and trg again!", (255, 0, 0))
                     feedback_y = quiz_box_y + quiz_box_height - 60  # bottom padding
                     self.lobby_screen.blit(feedback_surface, (quiz_box_x + 40, feedback_y))
 
         else:
             # Draw game over screen
-            overlay = pygame.Surface(self.lobby_screen.get_size())
-            overlay.fill(self.color_bg)
-            self.lobby_screen.blit(overlay, (0, 0))
+            self.lobby_screen.blit(self._gameover_overlay, (0, 0))
             
             # Title
-            title_font = pygame.font.Font(None, 80)
-            title = title_font.render("GAME OVER", True, self.color_text)
+            title = self._render(self.font_title, "GAME OVER", self.color_text)
             title_x = (self.lobby_screen.get_width() - title.get_width()) // 2
             self.lobby_screen.blit(title, (title_x, 100))
             
@@ -225,77 +360,143 @@ class Server:
             y_pos = 180
             for rank, (pid, info) in enumerate(sorted_scores, start=1):
                 score_text = f"{rank}. Player {pid}: {info.score}"
-                text = pygame.font.Font(None, 50).render(score_text, True, self.color_text)
+                text = self._render(self.font_score, score_text, self.color_text)
                 text_x = (self.lobby_screen.get_width() - text.get_width()) // 2
                 self.lobby_screen.blit(text, (text_x, y_pos))
                 y_pos += 50
             
             # Exit prompt
-            exit_text = pygame.font.Font(None, 40).render(
-                "Press any key to exit", True, self.color_text)
+            exit_text = self._render(self.font_exit,
+                "Press any key to exit", self.color_text)
             exit_x = (self.lobby_screen.get_width() - exit_text.get_width()) // 2
             self.lobby_screen.blit(exit_text, (exit_x, y_pos + 50))
 
         if hasattr(self, 'info_message') and time.time() - self.info_message_time < 3:
-            msg_surface = self.font.render(self.info_message, True, (255, 0, 0))
+            msg_surface = self._render(self.font, self.info_message, (255, 0, 0))
             self.lobby_screen.blit(msg_surface, (self.lobby_screen.get_width()//2 - msg_surface.get_width()//2, 10))    
 
         pygame.display.flip()
 
     def move_player(self, player, direction):
-        """Helper method for moving a player in the game loop."""
-        new_x, new_y = player.x, player.y
-        if direction == "up":
-            new_y -= 1
-        elif direction == "down":
-            new_y += 1
-        elif direction == "left":
-            new_x -= 1
-        elif direction == "right":
-            new_x += 1
-        if 0 <= new_x < self.map_width and 0 <= new_y < self.map_height:
-            if (new_x, new_y) not in self.obstacles:
-                player.x, player.y = new_x, new_y
+        """Move a player one cell if the target is in bounds and walkable.
+
+        Single movement path for both the host's keypresses and remote
+        clients' move messages. Only this player's position plus the
+        immutable map data are touched, so the per-player lock suffices;
+        the delta frame goes out after the lock is released.
+        """
+        dx, dy = DIRS.get(direction, (0, 0))
+        w, h, grid = self.map_width, self.map_height, self.obstacle_grid
+        moved = False
+        with player.lock:
+            new_x = player.x + dx
+            new_y = player.y + dy
+            if 0 <= new_x < w and 0 <= new_y < h:
+                if not grid[new_y * w + new_x]:
+                    player.x = new_x
+                    player.y = new_y
+                    moved = True
+        if moved:
+            self._bump_state_version()
+            self.broadcast_frame(encode_pmove(player.id, new_x, new_y))
+
+    def _load_quiz_bank(self):
+        """Load the quiz bank, preferring a pickled cache of the parsed JSON.
+
+        The cache stores the questions with correct_index already cast to
+        int and is regenerated whenever the JSON file is newer, so editing
+        quizQuestions.json keeps working as before.
+        """
+        json_path = "./quizQuestions.json"
+        cache_path = "./quizQuestions.pkl"
+        try:
+            if os.path.getmtime(cache_path) >= os.path.getmtime(json_path):
+                with open(cache_path, "rb") as f:
+                    return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass  # no cache or a stale/corrupt one; fall through to the JSON
+        with open(json_path, "r") as f:
+            quiz_data = json.load(f)
+        all_questions = quiz_data.get("Questions", [])
+        # Convert the correct_index from string to int for each question.
+        for q in all_questions:
+            q["correct_index"] = int(q["correct_index"])
+        try:
+            with open(cache_path, "wb") as f:
+                pickle.dump(all_questions, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass  # the cache is just an optimization
+        return all_questions
+
+    def _register_mic(self, mic):
+        """Add a microphone to the list, its indexes and the broadcast view."""
+        self.microphones.append(mic)
+        self._mics_view.append(mic.state_view)
+        self._mics_by_pos[(mic.x, mic.y)] = mic
+        self._mics_by_id[mic.id] = mic
+        if mic.id >= self._next_mic_id:
+            self._next_mic_id = mic.id + 1
+        if not mic.answered:
+            self._unanswered_count += 1
+        # A mic's question never changes, so its question reply can be
+        # encoded once here instead of on every successful interact
+        self._question_frames[mic.id] = encode_message({
+            "type": "question",
+            "mic_id": mic.id,
+            "question": mic.question,
+            "options": mic.options
+        })
+
+    def _add_player(self, player):
+        """Add a player to the dict and the reusable broadcast view."""
+        self.players[player.id] = player
+        self._players_view[player.id] = player.state_view
+        if player.ready:
+            self._ready_count += 1
 
     def server_interact(self, player):
         """When the server interacts with a mic, enter quiz mode."""
-        for mic in self.microphones:
-            if mic.x == player.x and mic.y == player.y and not mic.answered:
-                
-                if mic.cooldowns.get(self.server_player_id, 0) > time.time():
-                    self.info_message = "Please wait 3 seconds before trying again."
-                    self.info_message_time = time.time()
-                    return
-
-                if mic.lock.acquire(blocking=False):
-                    if mic.active_by is None:
-                        mic.active_by = player.id
-                        self.in_question = True
-                        self.current_question = {
-                            "id": mic.id,
-                            "text": mic.question,
-                            "options": mic.options
-                        }
-                        self.last_answer_correct = None
-                    else:
-                        print("Mic is in use.")
+        mic = self._mics_by_pos.get((player.x, player.y))
+        if mic and not mic.answered:
+            if mic.cooldowns.get(self.server_player_id, 0) > time.monotonic():
+                self.info_message = "Please wait 3 seconds before trying again."
+                self.info_message_time = time.time()
+                self._ui_dirty = True
                 return
 
+            if mic.active_by is None:
+                mic.active_by = player.id
+                self.in_question = True
+                self._ui_dirty = True
+                self.current_question = {
+                    "id": mic.id,
+                    "text": mic.question,
+                    "options": mic.options
+                }
+                self.last_answer_correct = None
+            else:
+                print("Mic is in use.")
+
     def start(self):
         """Main server loop handling lobby and game phases."""
-        accept_thread = threading.Thread(target=self.accept_clients, daemon=True)
-        accept_thread.start()
+        network_thread = threading.Thread(target=self.network_loop, daemon=True)
+        network_thread.start()
+        if self.headless:
+            self.run_headless()
+            return
         self.run_lobby()  # Lobby phase
 
         # Main game loop after lobby
         clock = pygame.time.Clock()
         try:
             while not self.game_over:
-                for event in pygame.event.get():
+                for event in pygame.event.get((pygame.QUIT, pygame.KEYDOWN)):
                     if event.type == pygame.QUIT:
                         self.stop()
                         return
                     elif event.type == pygame.KEYDOWN:
+                        # Any keypress can change what is on screen
+                        self._ui_dirty = True
                         with self.lock:
                             # In quiz mode
                             if self.in_question:
@@ -304,39 +505,23 @@ class Server:
                                     if event.key == pygame.K_ESCAPE:
                                         # Cancel quiz mode and allow new attempts (unlock mic)
                                         mic_id = self.current_question["id"]
-                                        mic = next((m for m in self.microphones if m.id == mic_id), None)
+                                        mic = self._mics_by_id.get(mic_id)
                                         if mic:
                                             mic.active_by = None
-                                            try:
-                                                mic.lock.release()
-                                            except RuntimeError:
-                                                pass
-                                            mic.cooldowns[self.server_player_id] = time.time() + 3
+                                            mic.cooldowns[self.server_player_id] = time.monotonic() + 3
                                         self.in_question = False
                                         self.current_question = None
                                         self.last_answer_correct = None
                                         self.broadcast(self.build_state_message())
                                     continue  # Ignore other keys until ESC is pressed
-                                selected_index = None
-                                if event.key == pygame.K_1:
-                                    selected_index = 0
-                                elif event.key == pygame.K_2:
-                                    selected_index = 1
-                                elif event.key == pygame.K_3:
-                                    selected_index = 2
-                                elif event.key == pygame.K_4:
-                                    selected_index = 3
-                                elif event.key == pygame.K_ESCAPE: # When 'ECS' is pressed, apply 3 second cooldown
+                                selected_index = self._quiz_keys.get(event.key)
+                                if selected_index is None and event.key == pygame.K_ESCAPE: # When 'ECS' is pressed, apply 3 second cooldown
                                     if self.current_question:
                                         mic_id = self.current_question["id"]
-                                        mic = next((m for m in self.microphones if m.id == mic_id), None)
+                                        mic = self._mics_by_id.get(mic_id)
                                         if mic:
                                             mic.active_by = None
-                                            try:
-                                                mic.lock.release()
-                                            except RuntimeError:
-                                                pass
-                                            mic.cooldowns[self.server_player_id] = time.time() + 3 # 3 second cooldown
+                                            mic.cooldowns[self.server_player_id] = time.monotonic() + 3 # 3 second cooldown
                                     # Cancel quiz mode if desired
                                     self.in_question = False
                                     self.current_question = None
@@ -347,15 +532,17 @@ class Server:
                                 # Check if key pressed equal the correct answer
                                 if selected_index is not None and self.current_question:
                                     mic_id = self.current_question["id"]
-                                    mic = next((m for m in self.microphones if m.id == mic_id), None)
+                                    mic = self._mics_by_id.get(mic_id)
                                     if mic:
                                         # Correct answer
                                         if selected_index == mic.correct_index:
                                             mic.answered = True
+                                            self._unanswered_count -= 1
                                             mic.active_by = None
                                             self.in_question = False
                                             self.current_question = None
                                             self.players[self.server_player_id].score += 1
+                                            self._bump_state_version()
                                             self.last_answer_correct = True
                                             print("Server answered correctly!")
 
@@ -366,48 +553,53 @@ class Server:
                                             print("Server answered incorrectly. Press ESC to cancel.")
                                             # Do not cancel the quiz overlay automatically; clients can now see that the mic is free.
                                             mic.active_by = None
-                                            try:
-                                                mic.lock.release()
-                                            except RuntimeError:
-                                                pass
-                                            mic.cooldowns[self.server_player_id] = time.time() + 3
+                                            mic.cooldowns[self.server_player_id] = time.monotonic() + 3
                                         self.broadcast(self.build_state_message())
 
                             # Action not in quiz mode 
                             else:
                                 # Normal movement and interact
                                 player = self.players.get(self.server_player_id)
-                                if event.key in (pygame.K_w, pygame.K_UP):
-                                    self.move_player(player, "up")
-                                elif event.key in (pygame.K_s, pygame.K_DOWN):
-                                    self.move_player(player, "down")
-                                elif event.key in (pygame.K_a, pygame.K_LEFT):
-                                    self.move_player(player, "left")
-                                elif event.key in (pygame.K_d, pygame.K_RIGHT):
-                                    self.move_player(player, "right")
+                                direction = self._move_keys.get(event.key)
+                                if direction:
+                                    self.move_player(player, direction)
                                 elif event.key in (pygame.K_e, pygame.K_SPACE):
                                     self.server_interact(player)
                                 elif self.game_over:
                                     self.stop()
                                     return
+                frame = None
                 with self.lock:
                     if self.game_started and not self.game_over:
-                        current_time = time.time()
-                        elapsed = int(current_time - self.start_time)
+                        elapsed = int(time.monotonic() - self.start_time)
                         time_left = max(0, self.time_limit - elapsed)
+                        self._time_left = time_left
                         if time_left <= 0:
                             self.game_over = True
                         state_msg = self.build_state_message()
-                        self.broadcast(state_msg)
-                self.draw_game()
+                        frame = self._encode_state(state_msg)
+                # Only put a state frame on the wire when something changed
+                # since the last broadcast; a burst of moves between frames
+                # still collapses into one snapshot per tick.
+                if frame and self._state_key != self._sent_state_key:
+                    self._sent_state_key = self._state_key
+                    self.broadcast_frame(frame, coalesce=True)
+                # Redraw only when something changed: a state mutation, a
+                # keypress, or the on-screen timer crossing a second.
+                if self._time_left != self._last_drawn_second:
+                    self._last_drawn_second = self._time_left
+                    self._ui_dirty = True
+                if self._ui_dirty:
+                    self._ui_dirty = False
+                    self.draw_game()
                 clock.tick(60)
-            # Wait for key press at game over screen
+            # Wait for key press at game over screen (static, draw it once)
+            self.draw_game()
             while self.game_over:
-                for event in pygame.event.get():
+                for event in pygame.event.get((pygame.QUIT, pygame.KEYDOWN)):
                     if event.type == pygame.KEYDOWN:
                         self.stop()
                         return
-                self.draw_game()
                 clock.tick(60)
         except KeyboardInterrupt:
             print("Server shutting down (KeyboardInterrupt).")
@@ -415,43 +607,145 @@ class Server:
             self.stop()
             pygame.quit()
 
-    def accept_clients(self):
-        """Accept incoming client connections and initialize players."""
-        next_player_id = 2 # Since server is player 1
+    def run_headless(self):
+        """Dedicated-server loop: no pygame window, network traffic only.
+
+        The lobby phase is driven entirely by the clients' ready toggles;
+        once the game starts, broadcast state at a fixed tick rate until
+        time runs out or the quiz bank is exhausted.
+        """
+        try:
+            while self.lobby_active and not self.game_over:
+                self._tick_event.wait(0.1)
+            tick = 1 / 30
+            next_deadline = time.monotonic() + tick
+            while not self.game_over:
+                with self.lock:
+                    elapsed = int(time.monotonic() - self.start_time)
+                    self._time_left = max(0, self.time_limit - elapsed)
+                    if self._time_left <= 0:
+                        self.game_over = True
+                    state_msg = self.build_state_message()
+                    frame = self._encode_state(state_msg)
+                if self._state_key != self._sent_state_key:
+                    self._sent_state_key = self._state_key
+                    self.broadcast_frame(frame, coalesce=True)
+                # Monotonic deadlines keep the tick cadence from drifting the
+                # way a bare sleep(tick) would; waiting on the event instead
+                # of sleeping lets stop() wake the loop immediately.
+                self._tick_event.wait(max(0, next_deadline - time.monotonic()))
+                next_deadline += tick
+            self.broadcast_game_over()
+        except KeyboardInterrupt:
+            print("Server shutting down (KeyboardInterrupt).")
+        finally:
+            self.stop()
+
+    def network_loop(self):
+        """Single-threaded selectors event loop for all client traffic.
+
+        One epoll/select loop replaces the old thread-per-client model:
+        the listen socket and every client socket are registered with the
+        selector, reads are buffered per connection, and complete frames
+        are dispatched to handle_message.
+        """
         while not self.game_over:
+            # Wake sooner while some client still has queued outbound bytes
+            timeout = 0.01 if any(ctx["out"] for ctx in self._client_ctx.values()) else 0.1
             try:
-                client_sock, addr = self.server_socket.accept()
+                events = self.selector.select(timeout=timeout)
             except OSError:
-                break  # Socket closed, stop accepting
-            with self.lock:
-                if len(self.players) >= self.max_players:
-                    send_data(client_sock, {"type": "error", "message": "Server full"})
-                    client_sock.close()
-                    continue
-                # Initialize configuration for client
-                player_id = next_player_id
-                spawn_x, spawn_y = self.find_spawn_position(player_id)
-                next_player_id += 1
-                new_player = Player(player_id, spawn_x, spawn_y)
-                self.players[player_id] = new_player
-                self.clients[player_id] = client_sock
-                print(f"Player {player_id} connected from {addr}, spawn at ({spawn_x},{spawn_y})")
-                # Send initial game state to client
-                init_msg = {
-                    "type": "init",
-                    "player_id": player_id,
-                    "players": {pid: {"x": p.x, "y": p.y, "score": p.score} for pid, p in self.players.items()},
-                    "microphones": [{"id": m.id, "x": m.x, "y": m.y, "answered": m.answered} for m in self.microphones],
-                    "time_left": self.time_limit if not self.start_time else max(0, self.time_limit - int(time.time() - self.start_time))
-                }
-                send_data(client_sock, init_msg)
-                
-                # Broadcast updated lobby state
-                self.broadcast_lobby_update()
-            client_thread = threading.Thread(target=self.handle_client, args=(client_sock, player_id), daemon=True)
-            client_thread.start()
+                break  # Selector closed, stop serving
+            for key, _mask in events:
+                if key.data is None:
+                    self.accept_client()
+                else:
+                    self.service_client(key)
+            if self._countdown_deadline is not None and time.monotonic() >= self._countdown_deadline:
+                self._tick_countdown()
+            self._flush_outbound()
+        print("Stopped serving clients.")
 
-        print("Stopped accepting new clients.")
+    def accept_client(self):
+        """Accept one incoming connection and initialize its player."""
+        try:
+            client_sock, addr = self.server_socket.accept()
+        except (BlockingIOError, OSError):
+            return  # Nothing to accept / socket closed
+        # Give each client a generous send buffer (>= 64KB) so the small
+        # state frames sent in broadcast() never block the server on send.
+        client_sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 65536)
+        # Nagle off: pmove/answer_result frames are tiny and latency-bound,
+        # and the outbound buffering already batches writes at the app level.
+        client_sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Keepalive surfaces dead peers as read events instead of leaving
+        # their buffers queued forever after a silent drop.
+        client_sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        with self.lock:
+            if len(self.players) >= self.max_players:
+                send_data(client_sock, {"type": "error", "message": "Server full"})
+                client_sock.close()
+                return
+            # Initialize configuration for client: take the lowest free id so
+            # ids stay within 1..max_players across join/leave churn and each
+            # returning slot gets its corner spawn back (the capacity check
+            # above guarantees one is free). The server itself holds id 1
+            # when hosting with a UI.
+            player_id = min(set(range(1, self.max_players + 1)) - self.players.keys())
+            spawn_x, spawn_y = self.find_spawn_position(player_id)
+            new_player = Player(player_id, spawn_x, spawn_y)
+            self._add_player(new_player)
+            self.clients[player_id] = client_sock
+            self._bump_state_version()
+            self._lobby_dirty = True
+            print(f"Player {player_id} connected from {addr}, spawn at ({spawn_x},{spawn_y})")
+            # Send initial game state to client
+            init_msg = {
+                "type": "init",
+                "player_id": player_id,
+                "players": self._players_view,
+                "microphones": self._mics_view,
+                "time_left": self.time_limit if not self.start_time else max(0, self.time_limit - int(time.monotonic() - self.start_time))
+            }
+            lobby_msg = {
+                "type": "lobby_state",
+                "players": {pid: p.ready for pid, p in self.players.items()}
+            }
+        # Send the handshake without holding the lock: a slow peer here must
+        # not stall every other client's requests.
+        send_data(client_sock, init_msg)
+        client_sock.setblocking(False)
+        ctx = {
+            "pid": player_id,
+            "buf": bytearray(),          # inbound bytes awaiting a full frame
+            "out": bytearray(),          # outbound bytes the socket has not taken yet
+            "soff": -1,                  # offset of a queued state frame still fully unsent
+            "slen": 0,                   # length of that state frame
+            "olock": threading.Lock()    # serializes senders against the flush pass
+        }
+        self._client_ctx[player_id] = ctx
+        self._client_ids = tuple(self.clients)
+        self.selector.register(client_sock, selectors.EVENT_READ, data=ctx)
+        # Announce the join only after the connection is registered, so the
+        # lobby_state that reports this player's arrival reaches them too.
+        self.broadcast(lobby_msg)
+
+    def service_client(self, key):
+        """Read available bytes for one client and dispatch complete frames."""
+        client_sock = key.fileobj
+        ctx = key.data
+        try:
+            chunk = client_sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            chunk = b""
+        if not chunk:
+            self.disconnect_client(ctx["pid"], client_sock)
+            return
+        ctx["buf"] += chunk
+        for data in extract_frames(ctx["buf"]):
+            self.handle_message(client_sock, ctx["pid"], data)
 
     # Helper function to find spawn location base on player id
     def find_spawn_position(self, player_id):
@@ -462,15 +756,7 @@ class Server:
             Player 3: bottom-left corner
             Player 4: bottom-right corner
         '''
-        grid_width = self.map_width
-        grid_height = self.map_height
-        corner_positions = {
-            1: (0, 2),
-            2: (grid_width - 1, 2),
-            3: (0, grid_height - 1),
-            4: (grid_width - 1, grid_height - 1)
-        }
-        return corner_positions.get(player_id, (0, 0))
+        return self._spawns[(player_id - 1) % len(self._spawns)]
 
 
     def broadcast_lobby_update(self):
@@ -487,250 +773,372 @@ class Server:
 
     def run_lobby(self):
         """Pygame-based lobby loop handling player readiness."""
-        clock = pygame.time.Clock()
         while self.lobby_active:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.stop()
-                    return
+            # Block in C until an event or the timeout; the roster only
+            # changes on joins/leaves/ready toggles, so there is nothing to
+            # poll for and the lobby idles at ~0% CPU between repaints
+            event = pygame.event.wait(100)
+            if event.type == pygame.QUIT:
+                self.stop()
+                return
+            if not self._lobby_dirty:
+                continue
+            self._lobby_dirty = False
             # Draw Lobby and display IP address and Port number
             self.lobby_screen.fill((30, 30, 60))
-            title = self.font.render("Server Lobby - Waiting for Players", True, (255, 255, 255))
-            server_ip = self.font.render(f"Server IP: {self.host}", True, (255, 255, 255))
-            server_port = self.font.render(f"Server Port: {self.port}", True, (255, 255, 255))
-            title_rect = title.get_rect(center=(self.lobby_screen.get_width() // 2, 80))
-            ip_rect = server_ip.get_rect(center=(self.lobby_screen.get_width() // 2, 50))
-            port_rect = server_port.get_rect(center=(self.lobby_screen.get_width() // 2, 20))
-            self.lobby_screen.blit(title, title_rect)
-            self.lobby_screen.blit(server_ip, ip_rect)
-            self.lobby_screen.blit(server_port, port_rect)
+            center_x = self.lobby_screen.get_width() // 2
+            title = self._render(self.font, "Server Lobby - Waiting for Players", (255, 255, 255))
+            server_ip = self._render(self.font, f"Server IP: {self.host}", (255, 255, 255))
+            server_port = self._render(self.font, f"Server Port: {self.port}", (255, 255, 255))
+            self.lobby_screen.blit(title, title.get_rect(center=(center_x, 80)))
+            self.lobby_screen.blit(server_ip, server_ip.get_rect(center=(center_x, 50)))
+            self.lobby_screen.blit(server_port, server_port.get_rect(center=(center_x, 20)))
             y = 150
 
             # Draw each player's Ready Status
             for pid, player in self.players.items():
                 status = "Ready" if player.ready else "Waiting"
                 color = (0, 255, 0) if player.ready else (255, 0, 0)
-                text = self.font.render(f"Player {pid}: {status}", True, color)
-                text_rect = text.get_rect(center=(self.lobby_screen.get_width() // 2, y))
-                self.lobby_screen.blit(text, text_rect)
+                text = self._render(self.font, f"Player {pid}: {status}", color)
+                self.lobby_screen.blit(text, text.get_rect(center=(center_x, y)))
                 y += 40
             pygame.display.flip()
-            clock.tick(60)
 
     def start_game_countdown(self):
-        """10-second countdown before game starts"""
-        for i in range(5, 0, -1):
-            self.countdown = i
-            self.broadcast({"type": "countdown", "time": i})
-            time.sleep(1)
-        self.lobby_active = False
-        self.broadcast({"type": "game_start"})
-        self.start_time = time.time()
-        self.game_started = True
-
-    def handle_client(self, client_socket, player_id):
-        """Handle messages from a connected client."""
-        while not self.game_over:
-            data = recv_data(client_socket)
-            if data is None:
-                break
+        """Schedule the 5-second pre-game countdown.
+
+        The ticks are driven by the network loop off a monotonic deadline;
+        the old sleep(1) loop ran inside a message handler and froze all
+        client traffic for the whole countdown.
+        """
+        self._countdown_value = 5
+        self._countdown_deadline = time.monotonic()
+
+    def _tick_countdown(self):
+        """Broadcast one countdown step; start the game when it hits zero."""
+        if self._countdown_value > 0:
+            self.countdown = self._countdown_value
+            self.broadcast({"type": "countdown", "time": self._countdown_value})
+            self._countdown_value -= 1
+            self._countdown_deadline += 1
+        else:
+            self._countdown_deadline = None
+            # Publish the start timestamp before flipping lobby_active: the
+            # headless tick loop wakes on that flag and reads start_time
+            # right away, so the old order left a window where it saw None.
+            self.start_time = time.monotonic()
+            self.game_started = True
+            self.lobby_active = False
+            self.broadcast({"type": "game_start"})
+
+    def handle_message(self, client_socket, player_id, data):
+        """Handle a single decoded message from a connected client."""
+        
+        msg_type = data.get("type")
+        if msg_type == "player_ready" and self.lobby_active:
+            # Capture the lobby snapshot under the lock, send outside it
+            lobby_msg = None
+            start_countdown = False
+            with self.lock:
+                player = self.players.get(player_id)
+                if player:
+                    player.ready = not player.ready
+                    self._ready_count += 1 if player.ready else -1
+                    self._lobby_dirty = True
+                    lobby_msg = {
+                        "type": "lobby_state",
+                        "players": {pid: p.ready for pid, p in self.players.items()}
+                    }
+                    start_countdown = self._ready_count == len(self.players)
+            if lobby_msg:
+                self.broadcast(lobby_msg)
+                if start_countdown:
+                    self.start_game_countdown()
+                        
+        elif msg_type == "move" and not self.lobby_active:
+            player = self.players.get(player_id)
+            if player:
+                self.move_player(player, data.get("direction"))
             
-            msg_type = data.get("type")
-            if msg_type == "player_ready" and self.lobby_active:
-                with self.lock:
-                    player = self.players.get(player_id)
-                    if player:
-                        player.ready = not player.ready
-                        self.broadcast_lobby_update()
-                        if all(p.ready for p in self.players.values()):
-                            self.start_game_countdown()
-                            
-            elif msg_type == "move" and not self.lobby_active:
-                direction = data.get("direction")
-                with self.lock:
-                    player = self.players.get(player_id)
-                    if player:
-                        new_x, new_y = player.x, player.y
-                        if direction == "up":
-                            new_y -= 1
-                        elif direction == "down":
-                            new_y += 1
-                        elif direction == "left":
-                            new_x -= 1
-                        elif direction == "right":
-                            new_x += 1
-                        if 0 <= new_x < self.map_width and 0 <= new_y < self.map_height:
-                            if (new_x, new_y) not in self.obstacles:
-                                player.x = new_x
-                                player.y = new_y
-                with self.lock:
-                    state_msg = self.build_state_message()
-                self.broadcast(state_msg)
-                
-            elif msg_type == "interact" and not self.lobby_active:
-                with self.lock:
-                    player = self.players.get(player_id)
-                    if not player:
-                        continue
+        elif msg_type == "interact" and not self.lobby_active:
+            # Decide the reply under the lock, send it after releasing
+            reply = None
+            with self.lock:
+                player = self.players.get(player_id)
+                if not player:
+                    return
 
+                mic_obj = self._mics_by_pos.get((player.x, player.y))
+                if mic_obj and mic_obj.answered:
                     mic_obj = None
-                    for m in self.microphones:
-                        if m.x == player.x and m.y == player.y and not m.answered:
-                            mic_obj = m
-                            break
-
-                    if mic_obj:
-                        # Check if the player is on cooldown for this mic:
-                        if mic_obj.cooldowns.get(player_id, 0) > time.time():
-                            info_msg = {"type": "info", "message": "Please wait 3 seconds before trying again."}
-                            send_data(self.clients[player_id], info_msg)
-                            continue
-
-                        # Try to acquire the lock:
-                        if mic_obj.lock.acquire(blocking=False):
-                            if mic_obj.active_by is None:
-                                mic_obj.active_by = player_id
-                                question_msg = {
-                                    "type": "question",
-                                    "mic_id": mic_obj.id,
-                                    "question": mic_obj.question,
-                                    "options": mic_obj.options
-                                }
-                                send_data(self.clients[player_id], question_msg)
 
-                            else:
-                                mic_obj.lock.release()
-                                info_msg = {"type": "info", "message": "Microphone is currently in use by another player."}
-                                send_data(self.clients[player_id], info_msg)
-                        else:
-                            info_msg = {"type": "info", "message": "Microphone is currently in use by another player."}
-                            send_data(self.clients[player_id], info_msg)
+                if mic_obj:
+                    # Check if the player is on cooldown for this mic:
+                    if mic_obj.cooldowns.get(player_id, 0) > time.monotonic():
+                        reply = _COOLDOWN_FRAME
 
-            elif msg_type == "answer" and not self.lobby_active:
-                mic_id = data.get("mic_id")
-                answer_idx = data.get("answer")
+                    # Claim the mic if nobody holds it (the server lock
+                    # already serializes every active_by access):
+                    elif mic_obj.active_by is None:
+                        mic_obj.active_by = player_id
+                        reply = self._question_frames[mic_obj.id]
+                    else:
+                        reply = _MIC_BUSY_FRAME
+            if reply:
+                self._send_to_client(player_id, reply)
 
-                with self.lock:
-                    mic_obj = next((m for m in self.microphones if m.id == mic_id), None)
-                    if not mic_obj or mic_obj.answered:
-                        continue
-                    if mic_obj.active_by != player_id:
-                        continue
-
-                    if answer_idx == mic_obj.correct_index:
-                        # Correct answer branch
-                        mic_obj.answered = True
-                        mic_obj.active_by = None
-                        mic_obj.lock.release()
-
-                        # update player's score
-                        if player_id in self.players:
-                            self.players[player_id].score += 1
+        elif msg_type == "answer" and not self.lobby_active:
+            mic_id = data.get("mic_id")
+            answer_idx = data.get("answer")
 
-                        state_msg = self.build_state_message()
+            result_msg = None
+            result_frame = None
+            state_msg = None
+            with self.lock:
+                mic_obj = self._mics_by_id.get(mic_id)
+                if not mic_obj or mic_obj.answered:
+                    return
+                if mic_obj.active_by != player_id:
+                    return
 
-                        # Check if all current microphones are answered and no unused questions remain
-                        all_answered = all(m.answered for m in self.microphones)
-                        if all_answered and not self.unused_questions:
-                            self.game_over = True
-                        result_msg = {"type": "answer_result", "correct": True}
-                        send_data(self.clients[player_id], result_msg)
-
-                        # Spawn a new quiz object if available and if one was answered correctly
-                        if self.unused_questions:
-                            new_question = self.unused_questions.pop(0)
-                            while True:
-                                new_x = random.randint(0, self.map_width - 1)
-                                new_y = random.randint(0, self.map_height - 1)
-                                if (new_x, new_y) not in self.obstacles:
-                                    break
-                            new_mic_id = max(m.id for m in self.microphones) + 1 if self.microphones else 1
-                            new_mic = Microphone(new_mic_id, new_x, new_y, new_question["question"], new_question["options"], new_question["correct_index"])
-                            self.microphones.append(new_mic)
-                    else: # Incorrect answer: release the microphone for others.
-                        mic_obj.active_by = None
-                        mic_obj.cooldowns[player_id] = time.time() + 3
-                        mic_obj.lock.release()
-                        send_data(self.clients[player_id], {"type": "answer_result", "correct": False})
-                if mic_obj and mic_obj.answered:
-                    self.broadcast(state_msg)
-                    if self.game_over:
-                        self.broadcast_game_over()
-                        break
-
-            elif msg_type == "cancel_quiz" and not self.lobby_active:
-                mic_id = data.get("mic_id")
-                if mic_id is None:
-                    # Optionally log or send back an error
-                    continue
-                with self.lock:
-                    mic_obj = next((m for m in self.microphones if m.id == mic_id), None)
-                    if mic_obj and mic_obj.active_by == player_id:
-                        mic_obj.active_by = None
-                        try:
-                            mic_obj.lock.release()
-                        except RuntimeError:
-                            pass
-                        mic_obj.cooldowns[player_id] = time.time() + 3
-                        info_msg = {"type": "info", "message": "Quiz cancelled. You may try again."}
-                        send_data(self.clients[player_id], info_msg)
-
-        # Cleanup on disconnect
+                if answer_idx == mic_obj.correct_index:
+                    # Correct answer branch
+                    mic_obj.answered = True
+                    self._unanswered_count -= 1
+                    mic_obj.active_by = None
+
+                    # update player's score
+                    if player_id in self.players:
+                        self.players[player_id].score += 1
+                    self._bump_state_version()
+
+                    # Check if all current microphones are answered and no unused questions remain
+                    if self._unanswered_count == 0 and not self.unused_questions:
+                        self.game_over = True
+                    result_msg = {"type": "answer_result", "correct": True}
+
+                    # Spawn a new quiz object if available and if one was answered correctly
+                    if self.unused_questions:
+                        new_question = self.unused_questions.popleft()
+                        # Draw from the walkable cells only; retries just
+                        # dodge the handful of already-occupied mic tiles
+                        while True:
+                            new_x, new_y = random.choice(self._free_cells)
+                            if (new_x, new_y) not in self._mics_by_pos:
+                                break
+                        new_mic_id = self._next_mic_id
+                        new_mic = Microphone(new_mic_id, new_x, new_y, new_question["question"], new_question["options"], new_question["correct_index"])
+                        self._register_mic(new_mic)
+
+                    # Snapshot the state (including any newly spawned mic)
+                    # for broadcast once the lock is released
+                    state_msg = self.build_state_message()
+                else: # Incorrect answer: release the microphone for others.
+                    mic_obj.active_by = None
+                    mic_obj.cooldowns[player_id] = time.monotonic() + 3
+                    result_frame = _ANSWER_WRONG_FRAME
+            if result_msg:
+                if state_msg:
+                    # Piggyback the fresh state on the answer_result so the
+                    # answering client gets one message, not two, and skip
+                    # them in the broadcast below.
+                    result_msg["state"] = state_msg
+                result_frame = encode_message(result_msg)
+            if result_frame:
+                self._send_to_client(player_id, result_frame)
+            if state_msg:
+                self.broadcast(state_msg, exclude_id=player_id)
+                if self.game_over:
+                    self.broadcast_game_over()
+                    return
+
+        elif msg_type == "cancel_quiz" and not self.lobby_active:
+            mic_id = data.get("mic_id")
+            if mic_id is None:
+                # Optionally log or send back an error
+                return
+            reply = None
+            with self.lock:
+                mic_obj = self._mics_by_id.get(mic_id)
+                if mic_obj and mic_obj.active_by == player_id:
+                    mic_obj.active_by = None
+                    mic_obj.cooldowns[player_id] = time.monotonic() + 3
+                    reply = _QUIZ_CANCELLED_FRAME
+            if reply:
+                self._send_to_client(player_id, reply)
+
+    def disconnect_client(self, player_id, client_socket):
+        """Remove a disconnected client and release anything it held."""
+        try:
+            self.selector.unregister(client_socket)
+        except (KeyError, ValueError):
+            pass
+        state_msg = None
+        removed = False
         with self.lock:
             if player_id in self.players:
-                print(f"Player {player_id} disconnected.")
+                removed = True
+                if self.players[player_id].ready:
+                    self._ready_count -= 1
                 self.players.pop(player_id, None)
+                self._players_view.pop(player_id, None)
                 self.clients.pop(player_id, None)
+                self._client_ctx.pop(player_id, None)
+                self._client_ids = tuple(self.clients)
+                self._bump_state_version()
+                self._lobby_dirty = True
 
                 # Release any microphone held by the disconnecting player.
                 for m in self.microphones:
                     if m.active_by == player_id:
                         m.active_by = None
-                        try:
-                            m.lock.release()
-                        except RuntimeError:
-                            pass
                 if not self.game_over:
                     state_msg = self.build_state_message()
-                    self.broadcast(state_msg)
-                    
+        if removed:
+            # Log after releasing the lock; stdout flushes can block on a
+            # slow pipe and would otherwise extend the critical section.
+            print(f"Player {player_id} disconnected.")
+        if state_msg:
+            self.broadcast(state_msg)
+
         client_socket.close()
 
-    def build_state_message(self):
-        """Construct game state message for clients."""
-        time_left = max(0, self.time_limit - int(time.time() - self.start_time)) if self.start_time else self.time_limit
-        players_data = {pid: {"x": p.x, "y": p.y, "score": p.score} for pid, p in self.players.items()}
-        mics_data = [{"id": m.id, "x": m.x, "y": m.y, "answered": m.answered} for m in self.microphones]
-        msg = {
-            "type": "state",
-            "players": players_data,
-            "microphones": mics_data,
-            "time_left": time_left,
-            "game_over": self.game_over
-        }
-        return msg
+    def _make_state_builder(self):
+        """Return a specialized build_state_message with hot lookups pre-bound.
+
+        The state containers are mutated in place (never rebound), so they can
+        be captured in the closure once; every call then uses fast local loads
+        instead of repeated attribute lookups on the broadcast hot path.
+        """
+        _players_view = self._players_view
+        _mics_view = self._mics_view
 
-    def broadcast(self, data, exclude_id=None):
-        """Send data to all connected clients."""
-        for pid, sock in list(self.clients.items()):
+        def build_state_message():
+            """Construct game state message for clients.
+
+            time_left is read from the int the tick loop maintains rather
+            than recomputed from the clock: second granularity is all the
+            clients display, and move broadcasts skip the time call.
+            """
+            msg = {
+                "type": "state",
+                "players": _players_view,
+                "microphones": _mics_view,
+                "time_left": self._time_left,
+                "game_over": self.game_over
+            }
+            return msg
+
+        return build_state_message
+
+    def _bump_state_version(self):
+        """Publish a new state version (thread-safe without the global lock)."""
+        self._state_version = next(self._version_counter)
+        self._ui_dirty = True
+
+    def _encode_state(self, state_msg):
+        """Encode a state message, reusing the cached frame when unchanged."""
+        key = (self._state_version, state_msg["time_left"], state_msg["game_over"])
+        if key != self._state_key:
+            self._state_frame = encode_message(state_msg)
+            self._state_key = key
+        return self._state_frame
+
+    def broadcast(self, data, exclude_id=None, coalesce=False):
+        """Send data to all connected clients, encoding the payload once."""
+        frame = encode_message(data)
+        self.broadcast_frame(frame, exclude_id, coalesce)
+
+    def broadcast_frame(self, frame, exclude_id=None, coalesce=False):
+        """Send an already-encoded frame to all connected clients.
+
+        Sends never wait for a slow peer: whatever the kernel does not
+        accept immediately stays in that client's outbound buffer and is
+        drained by the network loop, so one stalled client cannot delay
+        the others. Tick state frames pass coalesce=True: a fresh state
+        frame supersedes a queued one a stalled client never received,
+        so its backlog stays bounded instead of growing every tick.
+        """
+        for pid in self._client_ids:
             if exclude_id is not None and pid == exclude_id:
                 continue
+            self._send_to_client(pid, frame, coalesce)
+
+    def _send_to_client(self, pid, frame, coalesce=False):
+        """Queue a frame for one client and push as much as the socket takes.
+
+        With coalesce=True, if an earlier coalescible frame is still
+        sitting fully unsent in the buffer it is spliced out and replaced
+        by this one — the client only ever missed stale snapshots.
+        """
+        ctx = self._client_ctx.get(pid)
+        sock = self.clients.get(pid)
+        if ctx is None or sock is None:
+            return
+        with ctx["olock"]:
+            out = ctx["out"]
+            if coalesce:
+                soff = ctx["soff"]
+                if soff >= 0:
+                    out[soff:soff + ctx["slen"]] = frame
+                else:
+                    ctx["soff"] = len(out)
+                    out += frame
+                ctx["slen"] = len(frame)
+            else:
+                out += frame
             try:
-                send_data(sock, data)
-            except Exception as e:
+                sent = sock.send(out)
+                del out[:sent]
+                self._shift_state_offset(ctx, sent)
+            except BlockingIOError:
+                pass  # kernel buffer full; the network loop retries
+            except OSError as e:
                 print(f"Error sending to Player {pid}: {e}")
+                out.clear()
+                ctx["soff"] = -1
+
+    @staticmethod
+    def _shift_state_offset(ctx, sent):
+        """Track the queued state frame after sent bytes left the buffer."""
+        if ctx["soff"] >= 0:
+            if sent > ctx["soff"]:
+                ctx["soff"] = -1  # partially (or fully) on the wire now
+            else:
+                ctx["soff"] -= sent
+
+    def _flush_outbound(self):
+        """Drain queued bytes that earlier sends could not push."""
+        for pid, ctx in list(self._client_ctx.items()):
+            if not ctx["out"]:
+                continue
+            sock = self.clients.get(pid)
+            if sock is None:
+                continue
+            with ctx["olock"]:
+                try:
+                    sent = sock.send(ctx["out"])
+                    del ctx["out"][:sent]
+                    self._shift_state_offset(ctx, sent)
+                except BlockingIOError:
+                    pass
+                except OSError as e:
+                    print(f"Error sending to Player {pid}: {e}")
+                    ctx["out"].clear()
+                    ctx["soff"] = -1
 
     def broadcast_game_over(self):
         """Notify all clients the game has ended with final scores."""
-        players_data = {pid: {"x": p.x, "y": p.y, "score": p.score} for pid, p in self.players.items()}
-        self.broadcast({"type": "game_over", "players": players_data})
+        self.broadcast({"type": "game_over", "players": self._players_view})
 
     def stop(self):
         """Shutdown server and cleanup resources."""
         self.game_over = True
+        self._tick_event.set()  # wake any loop waiting out a tick
         for pid, sock in self.clients.items():
             sock.close()
         self.server_socket.close()
+        self.selector.close()
         print("Server stopped.")
 
 if __name__ == "__main__":
@@ -740,5 +1148,5 @@ if __name__ == "__main__":
     time_limit = int(args.time_limit)
 
     # Start server
-    server = Server(host=ip_address, port=port, time_limit=time_limit)
+    server = Server(host=ip_address, port=port, time_limit=time_limit, headless=args.headless)
     server.start()